@@ -0,0 +1,123 @@
+import sys
+import os
+import re
+import time
+import random
+import tempfile
+import subprocess
+import gatorDelivery as gd
+
+# Benchmark the OrderTree on orders that all have the same priority.
+#
+# The first part times OrderTree lookups and deletes on their own. The original OrderTree found an order by
+# a recursive scan of the whole tree, O(n), before deleting it; the current one looks the node up in its
+# order_id index, O(log n) overall. Both variants delete by the same exact key, so only the lookup differs.
+#
+# The second part runs gatorDelivery.py end to end: all orders share one creation time and one order value,
+# then the newest order and a random part of the rest are canceled, half of them in total.
+# Besides timing the run, check that exactly the canceled orders are missing at Quit.
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gatorDelivery.py")
+
+# Tree sizes and number of deletes per size for the OrderTree timing
+TREE_SIZES = [1000, 2000, 4000, 8000, 16000]
+NUM_DELETES = 200
+
+
+# Build an OrderTree of num_orders orders with one shared priority
+def build_order_tree(num_orders):
+    orders = gd.OrderStore()
+    tree = gd.OrderTree(orders)
+    for order_id in range(1, num_orders + 1):
+        tree.insert(0, orders.add(order_id, 1, 100, 1, 0))
+    return tree
+
+
+# The original OrderTree search: a recursive scan of the whole tree for the order_id
+def scan_search(tree, node, order_id):
+    if node is None:
+        return None
+    left_result = scan_search(tree, node.left, order_id)
+    if left_result:
+        return left_result
+    if tree.orders.order_id[node.slot] == order_id:
+        return node
+    return scan_search(tree, node.right, order_id)
+
+
+# Delete the way the original OrderTree did: scan for the node, then delete its key
+def scan_delete(tree, order_id):
+    node = scan_search(tree, tree.root, order_id)
+    tree.nodes.pop(order_id)
+    tree.root = tree._delete(tree.root, node.key)
+
+
+# Time deleting the given orders from a fresh tree, returning microseconds per delete
+def time_deletes(num_orders, order_ids, delete):
+    tree = build_order_tree(num_orders)
+    start = time.perf_counter()
+    for order_id in order_ids:
+        delete(tree, order_id)
+    elapsed = time.perf_counter() - start
+
+    # Exactly the deleted orders must be gone
+    remaining = {tree.orders.order_id[node.slot] for node in tree.nodes.values()}
+    assert remaining == set(range(1, num_orders + 1)) - set(order_ids)
+    return elapsed / len(order_ids) * 1e6
+
+
+def benchmark_order_tree(seed):
+    print(f"OrderTree delete of {NUM_DELETES} equal-priority orders (us per delete):")
+    print(f"{'orders':>8} {'scan (old)':>12} {'index (new)':>12}")
+    for num_orders in TREE_SIZES:
+        order_ids = random.Random(seed).sample(range(1, num_orders + 1), NUM_DELETES)
+        old = time_deletes(num_orders, order_ids, scan_delete)
+        new = time_deletes(num_orders, order_ids, gd.OrderTree.delete)
+        print(f"{num_orders:>8} {old:>12.1f} {new:>12.1f}")
+
+
+# Build the command lines of the equal-priority workload
+def build_workload(num_orders, seed):
+    order_ids = list(range(1, num_orders + 1))
+    # Always cancel the newest order first: it has the highest key and no successor in the OrderTree
+    canceled = [num_orders] + random.Random(seed).sample(order_ids[:-1], num_orders // 2 - 1)
+
+    lines = [f"createOrder({order_id}, 1, 100, 1)" for order_id in order_ids]
+    lines += [f"cancelOrder({order_id}, 1)" for order_id in canceled]
+    lines.append("Quit()")
+    return lines, set(order_ids) - set(canceled)
+
+
+def benchmark_program(num_orders, seed):
+    lines, expected = build_workload(num_orders, seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_file = os.path.join(directory, "bench.txt")
+        with open(input_file, "w") as file:
+            file.write("\n".join(lines))
+
+        # Time the whole run
+        start = time.perf_counter()
+        subprocess.run([sys.executable, SRC, input_file], check=True, stdout=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+
+        with open(os.path.join(directory, "bench_output_file.txt")) as file:
+            output = file.read()
+
+    # Orders still pending at Quit must be exactly the ones that were not canceled
+    remaining = {int(order_id) for order_id in re.findall(r"Order (\d+) will be delivered at time", output)}
+    canceled_messages = output.count("has been canceled")
+
+    # The run is dominated by the ETA recomputation every createOrder does, not by OrderTree deletes
+    print(f"gatorDelivery.py, {num_orders} equal-priority orders, {num_orders // 2} cancellations: {elapsed:.2f}s")
+    print(f"Canceled messages: {canceled_messages}, remaining orders correct: {remaining == expected}")
+
+
+def main():
+    num_orders = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    benchmark_order_tree(seed=5536)
+    print()
+    benchmark_program(num_orders, seed=5536)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+import sys
+import os
+import re
+import mmap
+import struct
+
+# Binary command record: opcode followed by up to four integer parameters (unused ones are 0)
+COMMAND_RECORD = struct.Struct("<B4q")
+
+# Size of the write buffer for result files
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+# Binary result record: result code followed by up to five integer fields (unused ones are 0)
+RESULT_RECORD = struct.Struct("<B5q")
+
+# Command opcodes
+CREATE_ORDER = 1
+PRINT_ORDER = 2
+PRINT_RANGE = 3
+GET_RANK_OF_ORDER = 4
+CANCEL_ORDER = 5
+UPDATE_TIME = 6
+QUIT = 7
+COUNT_ORDERS = 8
+SUM_ORDER_VALUE = 9
+SUM_DELIVERY_TIME = 10
+ADVANCE_TIME = 11
+
+# Command names of the text grammar, keyed by opcode
+COMMAND_NAMES = {
+    CREATE_ORDER: "createOrder",
+    PRINT_ORDER: "print",
+    PRINT_RANGE: "print",
+    GET_RANK_OF_ORDER: "getRankOfOrder",
+    CANCEL_ORDER: "cancelOrder",
+    UPDATE_TIME: "updateTime",
+    QUIT: "Quit",
+    COUNT_ORDERS: "countOrders",
+    SUM_ORDER_VALUE: "sumOrderValue",
+    SUM_DELIVERY_TIME: "sumDeliveryTime",
+    ADVANCE_TIME: "advanceTime",
+}
+
+# Number of parameters each command takes
+COMMAND_ARITY = {
+    CREATE_ORDER: 4,
+    PRINT_ORDER: 1,
+    PRINT_RANGE: 2,
+    GET_RANK_OF_ORDER: 1,
+    CANCEL_ORDER: 2,
+    UPDATE_TIME: 3,
+    QUIT: 0,
+    COUNT_ORDERS: 2,
+    SUM_ORDER_VALUE: 2,
+    SUM_DELIVERY_TIME: 2,
+    ADVANCE_TIME: 1,
+}
+
+# Opcodes of the text command names ('print' is resolved by its number of parameters)
+COMMAND_OPCODES = {name: opcode for opcode, name in COMMAND_NAMES.items() if name != "print"}
+
+# Result codes
+ORDER_CREATED = 1
+ORDER_DELIVERED = 2
+ORDER_DETAILS = 3
+NO_ORDER_WITH_ID = 4
+ORDERS_IN_RANGE = 5  # Followed by one RANGE_ITEM record per order
+RANGE_ITEM = 6
+NO_ORDERS_IN_RANGE = 7
+UPDATED_ETAS = 8  # Followed by one ETA_ITEM record per order
+ETA_ITEM = 9
+ORDER_RANK = 10
+ORDER_CANCELED = 11
+CANNOT_CANCEL = 12
+CANNOT_UPDATE = 13
+WILL_BE_DELIVERED = 14
+ORDER_COUNT = 15
+ORDER_VALUE_SUM = 16
+DELIVERY_TIME_SUM = 17
+
+# Text form of every single-record result
+RESULT_TEMPLATES = {
+    ORDER_CREATED: "Order {0} has been created - ETA: {1}\n",
+    ORDER_DELIVERED: "Order {0} has been delivered at time {1}\n",
+    ORDER_DETAILS: "[{0}, {1}, {2}, {3}, {4}]\n",
+    NO_ORDER_WITH_ID: "There are no orders with that ID\n",
+    NO_ORDERS_IN_RANGE: "There are no orders in that time period\n",
+    ORDER_RANK: "Order {0} will be delivered after {1} orders.\n",
+    ORDER_CANCELED: "Order {0} has been canceled\n",
+    CANNOT_CANCEL: "Cannot cancel. Order {0} has already been delivered\n",
+    CANNOT_UPDATE: "Cannot update. Order {0} has already been delivered\n",
+    WILL_BE_DELIVERED: "Order {0} will be delivered at time {1}\n",
+    ORDER_COUNT: "There are {0} orders in that time period\n",
+    ORDER_VALUE_SUM: "Total order value in that time period is {0}\n",
+    DELIVERY_TIME_SUM: "Total delivery time in that time period is {0}\n",
+}
+
+# Patterns recognising each text result line (tolerant of spacing and a trailing period)
+RESULT_PATTERNS = [
+    (ORDER_CREATED, re.compile(r"Order (-?\d+) has been created - ETA: ?(-?\d+)\.?$")),
+    (ORDER_DELIVERED, re.compile(r"Order (-?\d+) has been delivered at time (-?\d+)\.?$")),
+    (NO_ORDER_WITH_ID, re.compile(r"There are no orders with that ID\.?$")),
+    (NO_ORDERS_IN_RANGE, re.compile(r"There are no orders in that time period\.?$")),
+    (ORDER_RANK, re.compile(r"Order (-?\d+) will be delivered after (-?\d+) orders\.?$")),
+    (ORDER_CANCELED, re.compile(r"Order (-?\d+) has been canceled\.?$")),
+    (CANNOT_CANCEL, re.compile(r"Cannot cancel\. Order (-?\d+) has already been delivered\.?$")),
+    (CANNOT_UPDATE, re.compile(r"Cannot update\. Order (-?\d+) has already been delivered\.?$")),
+    (WILL_BE_DELIVERED, re.compile(r"Order (-?\d+) will be delivered at time (-?\d+)\.?$")),
+    (ORDER_COUNT, re.compile(r"There are (-?\d+) orders in that time period\.?$")),
+    (ORDER_VALUE_SUM, re.compile(r"Total order value in that time period is (-?\d+)\.?$")),
+    (DELIVERY_TIME_SUM, re.compile(r"Total delivery time in that time period is (-?\d+)\.?$")),
+]
+UPDATED_ETAS_PATTERN = re.compile(r"Updated ETAs: ?\[(.*)\]$")
+BRACKET_PATTERN = re.compile(r"\[(.*)\]$")
+
+
+# Check whether a file uses the binary record format
+def is_binary_file(path):
+    return os.path.splitext(path)[1] == ".bin"
+
+
+# Check whether a command tuple has a known opcode
+def is_known_command(command):
+    return command[0] in COMMAND_ARITY
+
+
+# Parse one line of the text command grammar into an (opcode, p1, p2, p3, p4) tuple,
+# or None if the line is not a known command with the right number of integer parameters
+def parse_command(line):
+    # Split the line into operation and parameters
+    tokens = line.strip().split('(')
+    if len(tokens) != 2:
+        return None
+    operation = tokens[0]
+    params = tokens[1][:-1].split(',')
+    try:
+        values = [int(param) for param in params if param.strip()]
+    except ValueError:
+        return None
+
+    # Determine whether print asks for order details or orders within a time range
+    if operation == "print":
+        opcode = PRINT_ORDER if len(values) == 1 else PRINT_RANGE
+    elif operation in COMMAND_OPCODES:
+        opcode = COMMAND_OPCODES[operation]
+    else:
+        return None
+    if len(values) != COMMAND_ARITY[opcode]:
+        return None
+
+    # Pad unused parameters with 0 so every command has the same shape as a binary record
+    values += [0] * (4 - len(values))
+    return (opcode, *values)
+
+
+# Parse a whole text command string into command tuples, skipping unknown or malformed lines
+def parse_commands(input_str):
+    for line in input_str.strip().split('\n'):
+        if line.strip():
+            command = parse_command(line)
+            if command:
+                yield command
+
+
+# Format a command tuple back into the text grammar
+def format_command(command):
+    opcode = command[0]
+    params = command[1:1 + COMMAND_ARITY[opcode]]
+    return f"{COMMAND_NAMES[opcode]}({', '.join(str(param) for param in params)})"
+
+
+# Read binary command records from a memory-mapped file, skipping records with unknown opcodes
+# and a trailing partial record, as the text reader skips malformed lines
+def read_binary_commands(path):
+    with open(path, "rb") as file:
+        # Only whole records are read; mmap cannot map an empty file
+        size = os.fstat(file.fileno()).st_size
+        whole_size = size - size % COMMAND_RECORD.size
+        if whole_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for offset in range(0, whole_size, COMMAND_RECORD.size):
+                command = COMMAND_RECORD.unpack_from(buffer, offset)
+                if is_known_command(command):
+                    yield command
+
+
+# Read commands from either a text or a binary command file
+def read_commands(path):
+    if is_binary_file(path):
+        return read_binary_commands(path)
+    with open(path, 'r') as file:
+        input_str = file.read()
+    return parse_commands(input_str)
+
+
+# Write command tuples as binary command records
+def write_binary_commands(path, commands):
+    with open(path, "wb") as file:
+        file.write(b"".join(COMMAND_RECORD.pack(*command) for command in commands))
+
+
+# Write command tuples in the text grammar
+def write_text_commands(path, commands):
+    with open(path, "w") as file:
+        file.write("\n".join(format_command(command) for command in commands))
+
+
+class TextResultWriter:
+    # Write results as the human readable text messages
+    def __init__(self, path):
+        self.file = open(path, "w", buffering=OUTPUT_BUFFER_SIZE)
+
+    def write(self, code, *fields):
+        self.file.write(RESULT_TEMPLATES[code].format(*fields))
+
+    # Write the order ids found in a time range
+    def write_orders(self, order_ids):
+        self.file.write('[' + ', '.join(str(order_id) for order_id in order_ids) + ']\n')
+
+    # Write the (order_id, eta) pairs whose ETA changed
+    def write_updated_etas(self, order_ids, etas):
+        pairs = ', '.join(f"{order_ids[i]}: {etas[i]}" for i in range(len(order_ids)))
+        self.file.write(f"Updated ETAs: [{pairs}]\n")
+
+    def close(self):
+        self.file.close()
+
+
+class BinaryResultWriter:
+    # Write results as fixed-size binary result records
+    def __init__(self, path):
+        self.file = open(path, "wb", buffering=OUTPUT_BUFFER_SIZE)
+
+    def write(self, code, *fields):
+        fields += (0,) * (5 - len(fields))
+        self.file.write(RESULT_RECORD.pack(code, *fields))
+
+    # Write a header record with the count followed by one record per order id
+    def write_orders(self, order_ids):
+        pack = RESULT_RECORD.pack
+        self.file.write(pack(ORDERS_IN_RANGE, len(order_ids), 0, 0, 0, 0))
+        self.file.write(b"".join(pack(RANGE_ITEM, order_id, 0, 0, 0, 0) for order_id in order_ids))
+
+    # Write a header record with the count followed by one record per (order_id, eta) pair
+    def write_updated_etas(self, order_ids, etas):
+        pack = RESULT_RECORD.pack
+        self.file.write(pack(UPDATED_ETAS, len(order_ids), 0, 0, 0, 0))
+        self.file.write(b"".join(pack(ETA_ITEM, order_ids[i], etas[i], 0, 0, 0) for i in range(len(order_ids))))
+
+    def close(self):
+        self.file.close()
+
+
+# Open the result writer matching the output file's format
+def open_result_writer(path):
+    if is_binary_file(path):
+        return BinaryResultWriter(path)
+    return TextResultWriter(path)
+
+
+# Replay binary result records into a text file
+def binary_results_to_text(src, dst):
+    with open(src, "rb") as file:
+        data = file.read()
+    records = list(RESULT_RECORD.iter_unpack(data))
+    writer = TextResultWriter(dst)
+    i = 0
+    while i < len(records):
+        code, *fields = records[i]
+        i += 1
+        if code == ORDERS_IN_RANGE:
+            # Gather the order ids that follow the header
+            writer.write_orders([record[1] for record in records[i:i + fields[0]]])
+            i += fields[0]
+        elif code == UPDATED_ETAS:
+            # Gather the (order_id, eta) pairs that follow the header
+            items = records[i:i + fields[0]]
+            writer.write_updated_etas([record[1] for record in items], [record[2] for record in items])
+            i += fields[0]
+        else:
+            writer.write(code, *fields)
+    writer.close()
+
+
+# Parse text result lines and write them as binary result records.
+# A bracketed line is either order details (print(orderId)) or order ids (print(t1, t2)); the text alone
+# cannot tell a 5-order range from order details, so the matching command file is used when given.
+def text_results_to_binary(src, dst, commands_path=None):
+    print_opcodes = []
+    if commands_path:
+        print_opcodes = [command[0] for command in read_commands(commands_path) if command[0] in (PRINT_ORDER, PRINT_RANGE)]
+    print_index = 0
+
+    with open(src, 'r') as file:
+        lines = file.read().split('\n')
+    writer = BinaryResultWriter(dst)
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        # Updated ETAs list, e.g. "Updated ETAs: [1003: 49, 1006: 78]"
+        match = UPDATED_ETAS_PATTERN.match(line)
+        if match:
+            pairs = [pair.split(':') for pair in match.group(1).split(',') if pair.strip()]
+            writer.write_updated_etas([int(pair[0]) for pair in pairs], [int(pair[1]) for pair in pairs])
+            continue
+
+        # Single-record messages
+        for code, pattern in RESULT_PATTERNS:
+            match = pattern.match(line)
+            if match:
+                writer.write(code, *(int(group) for group in match.groups()))
+                # Both "no orders" messages answer a print command
+                if code in (NO_ORDER_WITH_ID, NO_ORDERS_IN_RANGE):
+                    print_index += 1
+                break
+        else:
+            match = BRACKET_PATTERN.match(line)
+            if not match:
+                writer.close()
+                raise ValueError(f"Unrecognised result line: {line}")
+            values = [int(value) for value in match.group(1).split(',') if value.strip()]
+
+            # Use the answered print command if known, otherwise only order details have 5 fields
+            if print_index < len(print_opcodes):
+                is_details = print_opcodes[print_index] == PRINT_ORDER
+            else:
+                is_details = len(values) == 5
+            print_index += 1
+
+            if is_details:
+                writer.write(ORDER_DETAILS, *values)
+            else:
+                writer.write_orders(values)
+    writer.close()
+
+
+# Convert between the text and binary formats, choosing the direction from the source extension
+def convert(kind, src, dst, commands_path=None):
+    if kind == "commands":
+        if is_binary_file(src):
+            write_text_commands(dst, read_binary_commands(src))
+        else:
+            write_binary_commands(dst, read_commands(src))
+    elif is_binary_file(src):
+        binary_results_to_text(src, dst)
+    else:
+        text_results_to_binary(src, dst, commands_path)
+
+
+def main():
+    if len(sys.argv) not in (4, 5) or sys.argv[1] not in ("commands", "results"):
+        print("Usage: python formatConverter.py commands <src> <dst>")
+        print("       python formatConverter.py results <src> <dst> [<commands file>]")
+        sys.exit(1)
+    convert(*sys.argv[1:])
+    print("Converted", sys.argv[2], "to", sys.argv[3])
+
+if __name__ == "__main__":
+    main()
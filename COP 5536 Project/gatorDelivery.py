@@ -1,60 +1,104 @@
 import sys
 import os
+import heapq
+from array import array
+import formatConverter as fmt
 
-# Get the input file from makefile arguments
-input_file = sys.argv[1]
+# Result writer of the current run, opened by main() so the module can be imported on its own
+results = None
 
-# Extract the base name of the input file defined in the makefile
-base_filename = os.path.splitext(input_file)[0]
-output_file = f"{base_filename}_output_file.txt"
-with open(output_file, "w") as file:
-    pass  # This will clear the file
+# Tie-breaking sequence numbers occupy the low bits of an OrderTree key, below the scaled priority;
+# Python ints are unbounded, so the field is wide enough that no run can carry into the priority bits
+SEQUENCE_BITS = 64
+
+class OrderStore:
+    # Columnar store of order attributes; each order occupies one dense slot across all columns
+    def __init__(self):
+        self.order_id = array('q')
+        self.order_creation_time = array('q')
+        self.order_value = array('q')
+        self.delivery_time = array('q')
+        self.eta = array('q')  # Estimated time of arrival for the order
+        self.free_slots = []  # Slots of removed orders, reused before the columns grow
+
+    # Store a new order and return its slot
+    def add(self, order_id, order_creation_time, order_value, delivery_time, eta):
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.order_id[slot] = order_id
+            self.order_creation_time[slot] = order_creation_time
+            self.order_value[slot] = order_value
+            self.delivery_time[slot] = delivery_time
+            self.eta[slot] = eta
+        else:
+            slot = len(self.order_id)
+            self.order_id.append(order_id)
+            self.order_creation_time.append(order_creation_time)
+            self.order_value.append(order_value)
+            self.delivery_time.append(delivery_time)
+            self.eta.append(eta)
+        return slot
+
+    # Release the slot of an order that no tree refers to any more
+    def remove(self, slot):
+        self.free_slots.append(slot)
 
 class OrderNode:
+    __slots__ = ("key", "slot", "left", "right", "height")
+
     # Constructor method to initialize an OrderNode object
-    def __init__(self, priority, order_id, order_creation_time, order_value, delivery_time, eta):
+    def __init__(self, key, slot):
         # Initialize attributes with provided values
-        self.priority = priority  # Priority of the order
-        self.order_id = order_id  
-        self.order_creation_time = order_creation_time  
-        self.order_value = order_value  
-        self.delivery_time = delivery_time 
-        self.eta = eta  # Estimated time of arrival for the order
+        self.key = key  # Exact, unique tree key: scaled priority in the high bits, insertion sequence in the low bits
+        self.slot = slot  # Slot of the order's attributes in the OrderStore
         self.left = None  # Pointer to the left child node
         self.right = None  # Pointer to the right child node
         self.height = 1  # Height of the node, initially set to 1
 
+    # Scaled integer priority of the order
+    @property
+    def priority(self):
+        return self.key >> SEQUENCE_BITS
+
 class OrderTree:
-    # Initialize an empty binary search tree with no root
-    def __init__(self): 
+    # Initialize an empty binary search tree with no root over the orders held in an OrderStore
+    def __init__(self, orders): 
         self.root = None
+        self.orders = orders
+        self.nodes = {}  # Maps order_id to the node currently holding that order
+        self.sequence = 0  # Insertion counter that breaks ties between equal priorities
         
-    # Insert a new node into the tree
-    def insert(self, priority, order_id, order_creation_time, order_value, delivery_time, eta):
-        self.root = self._insert(self.root, priority, order_id, order_creation_time, order_value, delivery_time, eta)
+    # Insert the order in a store slot into the tree; equal priorities are ordered by insertion, later ones being greater
+    def insert(self, priority, slot):
+        key = (priority << SEQUENCE_BITS) + self.sequence
+        self.sequence += 1
+        new_node = OrderNode(key, slot)
+        self.nodes[self.orders.order_id[slot]] = new_node
+        self.root = self._insert(self.root, new_node)
 
     # Helper function to recursively insert a new node into the tree
-    def _insert(self, node, priority, order_id, order_creation_time, order_value, delivery_time, eta):
+    def _insert(self, node, new_node):
         if not node:
-            return OrderNode(priority, order_id, order_creation_time, order_value, delivery_time, eta)
-        elif priority < node.priority:
-            node.left = self._insert(node.left, priority, order_id, order_creation_time, order_value, delivery_time, eta)
+            return new_node
+        elif new_node.key < node.key:
+            node.left = self._insert(node.left, new_node)
         else:
-            node.right = self._insert(node.right, priority, order_id, order_creation_time, order_value, delivery_time, eta)
+            node.right = self._insert(node.right, new_node)
 
         # Update the height of the current node
         node.height = 1 + max(self._get_height(node.left), self._get_height(node.right))
 
         # Check and perform rotations if necessary to maintain balance
+        key = new_node.key
         balance = self._get_balance(node)
-        if balance > 1 and priority < node.left.priority:
+        if balance > 1 and key < node.left.key:
             return self._rotate_right(node)
-        if balance < -1 and priority > node.right.priority:
+        if balance < -1 and key > node.right.key:
             return self._rotate_left(node)
-        if balance > 1 and priority > node.left.priority:
+        if balance > 1 and key > node.left.key:
             node.left = self._rotate_left(node.left)
             return self._rotate_right(node)
-        if balance < -1 and priority < node.right.priority:
+        if balance < -1 and key < node.right.key:
             node.right = self._rotate_right(node.right)
             return self._rotate_left(node)
 
@@ -100,43 +144,21 @@ class OrderTree:
     
     # Search for an order with a given order_id in the tree
     def search(self, order_id):
-        return self._search(self.root, order_id)
-
-    # Helper function to recursively search for an order in the tree
-    def _search(self, node, order_id):
-        if node is None:
-            return None
-        
-        # Traverse the left subtree
-        left_result = self._search(node.left, order_id)
-        if left_result:
-            return left_result
-        
-        # Check if the current node's order_id matches the input order_id
-        if node.order_id == order_id:
-            return node
-        
-        # Traverse the right subtree
-        right_result = self._search(node.right, order_id)
-        if right_result:
-            return right_result
-        
-        # If no match found in the current subtree, return None
-        return None
+        return self.nodes.get(order_id)
 
-    # Find the predecessor node of a given order priority
-    def find_predecessor(self, priority):
+    # Find the predecessor node of a given order key
+    def find_predecessor(self, key):
         current = self.root
         predecessor = None
 
-        # Traverse the tree until the node with the given priority is found
+        # Traverse the tree until the node with the given key is found
         while current:
-            if priority < current.priority:
+            if key < current.key:
                 current = current.left
-            elif priority > current.priority:
+            elif key > current.key:
                 predecessor = current
                 current = current.right
-            else:  # If we find the node with the given priority
+            else:  # If we find the node with the given key
                 if current.left:
                     # The predecessor will be the maximum value in the left subtree
                     predecessor = self._find_max(current.left)
@@ -149,20 +171,26 @@ class OrderTree:
         while node.right:
             node = node.right
         return node
+
+    # Find the node with the highest key in the tree, or None if the tree is empty
+    def find_max(self):
+        if not self.root:
+            return None
+        return self._find_max(self.root)
     
-    # Find the successor node of a given order priority
-    def find_successor(self, priority):
+    # Find the successor node of a given order key
+    def find_successor(self, key):
         current = self.root
         successor = None
 
-        # Traverse the tree until the node with the given priority is found
+        # Traverse the tree until the node with the given key is found
         while current:
-            if priority < current.priority:
+            if key < current.key:
                 successor = current
                 current = current.left
-            elif priority > current.priority:
+            elif key > current.key:
                 current = current.right
-            else:  # If we find the node with the given priority
+            else:  # If we find the node with the given key
                 if current.right: 
                     # The successor will be the minimum value in the right subtree
                     successor = self._find_min(current.right)
@@ -178,20 +206,20 @@ class OrderTree:
     
     # Delete an order with a given order_id from the tree
     def delete(self, order_id):
-        # Find the node with the given order_id
-        node = self.search(order_id)
-        self.root = self._delete(self.root, node.priority)
+        # Find the node with the given order_id and drop it from the index
+        node = self.nodes.pop(order_id)
+        self.root = self._delete(self.root, node.key)
 
-    # Helper function to recursively delete a node from the tree
-    def _delete(self, node, priority):
+    # Helper function to recursively delete the node with an exact key from the tree
+    def _delete(self, node, key):
         if not node:
             return node
 
         # Find the node to be deleted
-        if priority < node.priority:
-            node.left = self._delete(node.left, priority)
-        elif priority > node.priority:
-            node.right = self._delete(node.right, priority)
+        if key < node.key:
+            node.left = self._delete(node.left, key)
+        elif key > node.key:
+            node.right = self._delete(node.right, key)
         else:
             # Case 1: Node with no child or only one child
             if not node.left:
@@ -203,15 +231,12 @@ class OrderTree:
             # Find the inorder successor (smallest node in the right subtree)
             successor = self._find_min(node.right)
             # Replace the node's value with the successor's value
-            node.priority = successor.priority
-            node.order_id = successor.order_id
-            node.order_creation_time = successor.order_creation_time
-            node.order_value = successor.order_value
-            node.delivery_time = successor.delivery_time
-            node.eta = successor.eta
+            node.key = successor.key
+            node.slot = successor.slot
+            self.nodes[self.orders.order_id[node.slot]] = node  # The successor's order now lives in this node
 
             # Delete the successor node
-            node.right = self._delete(node.right, successor.priority)
+            node.right = self._delete(node.right, successor.key)
 
         # Update height and balance factor
         node.height = 1 + max(self._get_height(node.left), self._get_height(node.right))
@@ -233,46 +258,67 @@ class OrderTree:
 
 
 class DeliveryNode:
+    __slots__ = ("key", "slot", "left", "right", "height", "size", "value_sum", "delivery_time_sum")
+
     # Constructor method to initialize a DeliveryNode object
-    def __init__(self, eta, order_id):
+    def __init__(self, key, slot, order_value, delivery_time):
         # Initialize attributes with provided values
-        self.eta = eta
-        self.order_id = order_id
+        self.key = key  # Exact, unique tree key: eta in the high bits, insertion sequence in the low bits
+        self.slot = slot  # Slot of the order's attributes in the OrderStore
         self.left = None
         self.right = None
         self.height = 1
+        # Aggregates over the subtree rooted at this node
+        self.size = 1  # Number of orders in the subtree
+        self.value_sum = order_value  # Total order_value in the subtree
+        self.delivery_time_sum = delivery_time  # Total delivery_time in the subtree
+
+    # ETA the delivery is scheduled for
+    @property
+    def eta(self):
+        return self.key >> SEQUENCE_BITS
 
 class DeliveryTree:
-    # Constructor method to initialize a DeliveryTree object
-    def __init__(self):
+    # Constructor method to initialize a DeliveryTree object over the orders held in an OrderStore
+    def __init__(self, orders):
         self.root = None
-
-    # Insert a new delivery into the tree
-    def insert(self, eta, order_id):
-        self.root = self._insert(self.root, eta, order_id)
+        self.orders = orders
+        # Columns the subtree aggregates are built from, bound once; the store only grows them in place
+        self.order_value = orders.order_value
+        self.delivery_time = orders.delivery_time
+        self.nodes = {}  # Maps order_id to the node currently holding that delivery
+        self.sequence = 0  # Insertion counter that breaks ties between equal etas
+
+    # Insert a delivery for the order in a store slot; equal etas are ordered by insertion, later ones being greater
+    def insert(self, eta, slot):
+        key = (eta << SEQUENCE_BITS) + self.sequence
+        self.sequence += 1
+        new_node = DeliveryNode(key, slot, self.order_value[slot], self.delivery_time[slot])
+        self.nodes[self.orders.order_id[slot]] = new_node
+        self.root = self._insert(self.root, new_node)
 
     # Helper function to recursively insert a new node into the tree
-    def _insert(self, node, eta, order_id):
+    def _insert(self, node, new_node):
         if not node:
-            return DeliveryNode(eta, order_id)
-        elif eta < node.eta:
-            node.left = self._insert(node.left, eta, order_id)
+            return new_node
+        elif new_node.key < node.key:
+            node.left = self._insert(node.left, new_node)
         else:
-            node.right = self._insert(node.right, eta, order_id)
+            node.right = self._insert(node.right, new_node)
 
-        # Update the height of the current node
-        node.height = 1 + max(self._get_height(node.left), self._get_height(node.right))
+        # Update the height and subtree aggregates of the current node
+        self._update(node)
 
         # Check and perform rotations if necessary to maintain balance
         balance = self._get_balance(node)
-        if balance > 1 and eta < node.left.eta:
+        if balance > 1 and self._get_balance(node.left) >= 0:
             return self._rotate_right(node)
-        if balance < -1 and eta > node.right.eta:
+        if balance < -1 and self._get_balance(node.right) <= 0:
             return self._rotate_left(node)
-        if balance > 1 and eta > node.left.eta:
+        if balance > 1 and self._get_balance(node.left) < 0:
             node.left = self._rotate_left(node.left)
             return self._rotate_right(node)
-        if balance < -1 and eta < node.right.eta:
+        if balance < -1 and self._get_balance(node.right) > 0:
             node.right = self._rotate_right(node.right)
             return self._rotate_left(node)
 
@@ -290,6 +336,18 @@ class DeliveryTree:
             return 0
         return self._get_height(node.left) - self._get_height(node.right)
 
+    # Recompute the height and subtree aggregates of a node from its children
+    def _update(self, node):
+        node.height = 1 + max(self._get_height(node.left), self._get_height(node.right))
+        node.size = 1
+        node.value_sum = self.order_value[node.slot]
+        node.delivery_time_sum = self.delivery_time[node.slot]
+        for child in (node.left, node.right):
+            if child:
+                node.size += child.size
+                node.value_sum += child.value_sum
+                node.delivery_time_sum += child.delivery_time_sum
+
     # Left rotation to balance the tree
     def _rotate_left(self, z):
         y = z.right
@@ -298,8 +356,8 @@ class DeliveryTree:
         y.left = z
         z.right = T2
 
-        z.height = 1 + max(self._get_height(z.left), self._get_height(z.right))
-        y.height = 1 + max(self._get_height(y.left), self._get_height(y.right))
+        self._update(z)
+        self._update(y)
 
         return y
 
@@ -311,36 +369,14 @@ class DeliveryTree:
         y.right = z
         z.left = T3
 
-        z.height = 1 + max(self._get_height(z.left), self._get_height(z.right))
-        y.height = 1 + max(self._get_height(y.left), self._get_height(y.right))
+        self._update(z)
+        self._update(y)
 
         return y
     
     # Search for an order with a given order_id in the tree
     def search(self, order_id):
-        return self._search(self.root, order_id)
-
-    # Helper function to recursively search for an order in the tree
-    def _search(self, node, order_id):
-        if node is None:
-            return None
-        
-        # Traverse the left subtree
-        left_result = self._search(node.left, order_id)
-        if left_result:
-            return left_result
-        
-        # Check if the current node's order_id matches the input order_id
-        if node.order_id == order_id:
-            return node
-        
-        # Traverse the right subtree
-        right_result = self._search(node.right, order_id)
-        if right_result:
-            return right_result
-        
-        # If no match found in the current subtree, return None
-        return None
+        return self.nodes.get(order_id)
 
     # Helper function to find the maximum value in a subtree
     def _find_max(self, node):
@@ -358,19 +394,20 @@ class DeliveryTree:
     
     # Delete an order with a given order_id from the tree
     def delete(self, order_id):
-        node = self.search(order_id)
-        self.root = self._delete(self.root, node.eta)
+        # Find the node with the given order_id and drop it from the index
+        node = self.nodes.pop(order_id)
+        self.root = self._delete(self.root, node.key)
 
-    # Helper function to recursively delete a node from the tree
-    def _delete(self, node, eta):
+    # Helper function to recursively delete the node with an exact key from the tree
+    def _delete(self, node, key):
         if not node:
             return node
 
         # Find the node to be deleted
-        if eta < node.eta:
-            node.left = self._delete(node.left, eta)
-        elif eta > node.eta:
-            node.right = self._delete(node.right, eta)
+        if key < node.key:
+            node.left = self._delete(node.left, key)
+        elif key > node.key:
+            node.right = self._delete(node.right, key)
         else:
             # Case 1: Node with no child or only one child
             if not node.left:
@@ -382,13 +419,14 @@ class DeliveryTree:
             # Find the inorder successor (smallest node in the right subtree)
             successor = self._find_min(node.right)
             # Replace the node's value with the successor's value
-            node.eta = successor.eta
-            node.order_id = successor.order_id
+            node.key = successor.key
+            node.slot = successor.slot
+            self.nodes[self.orders.order_id[node.slot]] = node  # The successor's order now lives in this node
             # Delete the successor node
-            node.right = self._delete(node.right, successor.eta)
+            node.right = self._delete(node.right, successor.key)
 
-        # Update height and balance factor
-        node.height = 1 + max(self._get_height(node.left), self._get_height(node.right))
+        # Update height, subtree aggregates and balance factor
+        self._update(node)
         balance = self._get_balance(node)
 
         # Perform rotations if needed
@@ -405,6 +443,21 @@ class DeliveryTree:
 
         return node
     
+    # Recompute the subtree aggregates above an order whose attributes changed in the store
+    def refresh(self, order_id):
+        key = self.nodes[order_id].key
+        path = []
+        node = self.root
+
+        # Collect the root-to-node path, then update it bottom-up
+        while node:
+            path.append(node)
+            if key == node.key:
+                break
+            node = node.left if key < node.key else node.right
+        for node in reversed(path):
+            self._update(node)
+
     # Search for orders within a given time range
     def search_range(self, time1, time2):
         result = []
@@ -418,7 +471,7 @@ class DeliveryTree:
 
         # Check if node's eta falls within the range
         if time1 <= node.eta <= time2:
-            result.append(node.order_id)
+            result.append(self.orders.order_id[node.slot])
 
         # Recursively search in left subtree if necessary
         if node.left and time1 <= node.eta:
@@ -428,37 +481,99 @@ class DeliveryTree:
         if node.right and node.eta <= time2:
             self._search_range_helper(node.right, time1, time2, result)
 
-    # Perform an inorder traversal of the tree
-    def inorder_traversal(self):
-        eta_array = []
-        order_id_array = []
-        self._inorder_traversal_helper(self.root, eta_array, order_id_array)
-        return eta_array, order_id_array
+    # Count orders and total their order_value and delivery_time for ETAs within [time1, time2]
+    def range_aggregate(self, time1, time2):
+        if time1 > time2:
+            return 0, 0, 0
+        high = self._prefix_aggregate(time2, True)
+        low = self._prefix_aggregate(time1, False)
+        return high[0] - low[0], high[1] - low[1], high[2] - low[2]
+
+    # Helper function to aggregate every order with eta <= time (or < time if not inclusive)
+    def _prefix_aggregate(self, time, inclusive):
+        count, value_sum, delivery_time_sum = 0, 0, 0
+        node = self.root
+
+        # Walk a single root-to-leaf path, taking whole left subtrees wherever the node is in range
+        while node:
+            if node.eta < time or (inclusive and node.eta == time):
+                if node.left:
+                    count += node.left.size
+                    value_sum += node.left.value_sum
+                    delivery_time_sum += node.left.delivery_time_sum
+                count += 1
+                value_sum += self.order_value[node.slot]
+                delivery_time_sum += self.delivery_time[node.slot]
+                node = node.right
+            else:
+                node = node.left
+        return count, value_sum, delivery_time_sum
+
+    # Perform a lazy inorder traversal, yielding (eta, order_id) in ETA order without building lists
+    def inorder(self):
+        # Explicit stack of the left spine, so memory stays at the tree height
+        stack = []
+        node = self.root
+        while stack or node:
+            # Descend to the leftmost unvisited node
+            while node:
+                stack.append(node)
+                node = node.left
+
+            # Process the current node, then continue with its right subtree
+            node = stack.pop()
+            yield node.eta, self.orders.order_id[node.slot]
+            node = node.right
+
+
+class DeliveryScheduler:
+    # Min-heap of pending delivery keys, kept in sync with a DeliveryTree
+    def __init__(self, delivery_tree):
+        self.delivery_tree = delivery_tree
+        self.heap = []  # (key, order_id) of every scheduled delivery; cancelled or rescheduled ones go stale
+
+    # Schedule the delivery currently held in the delivery tree for order_id
+    def schedule(self, order_id):
+        node = self.delivery_tree.search(order_id)
+        heapq.heappush(self.heap, (node.key, order_id))
+
+        # Drop stale entries once they outnumber the live deliveries
+        if len(self.heap) > 2 * len(self.delivery_tree.nodes) + 16:
+            self._compact()
+
+    # Check whether a heap entry still matches the delivery in the tree
+    def _is_live(self, key, order_id):
+        node = self.delivery_tree.search(order_id)
+        return node is not None and node.key == key
+
+    # Rebuild the heap from its live entries only
+    def _compact(self):
+        self.heap = [entry for entry in self.heap if self._is_live(*entry)]
+        heapq.heapify(self.heap)
+
+    # Pop the deliveries due by current_time, yielding (order_id, eta) in ETA order
+    def pop_due(self, current_time):
+        # Keys of every eta <= current_time are below this bound
+        limit = (current_time + 1) << SEQUENCE_BITS
+        while self.heap and self.heap[0][0] < limit:
+            key, order_id = heapq.heappop(self.heap)
+            if self._is_live(key, order_id):
+                yield order_id, key >> SEQUENCE_BITS
 
-    # Helper function to perform inorder traversal recursively
-    def _inorder_traversal_helper(self, node, eta_array, order_id_array):
-        if node is None:
-            return
-        
-        # Recursively traverse the left subtree
-        self._inorder_traversal_helper(node.left, eta_array, order_id_array)
-        
-        # Process the current node
-        eta_array.append(node.eta)
-        order_id_array.append(node.order_id)
-        
-        # Recursively traverse the right subtree
-        self._inorder_traversal_helper(node.right, eta_array, order_id_array)
 
+# Scaled priority step used to move an order in front of its predecessor (0.01 before scaling)
+PRIORITY_NUDGE = 5
 
 class OMS:
 
     current_time = 0 # Initialize currentTime as a class variable
 
     def __init__(self):
-        # Initialize OrderTree and DeliveryTree instances
-        self.order_tree = OrderTree()
-        self.delivery_tree = DeliveryTree()
+        # Initialize the order attribute store and the OrderTree and DeliveryTree instances over it
+        self.orders = OrderStore()
+        self.order_tree = OrderTree(self.orders)
+        self.delivery_tree = DeliveryTree(self.orders)
+        self.scheduler = DeliveryScheduler(self.delivery_tree)
 
     def create_order(self, order_id, order_creation_time, order_value, delivery_time):
         # Renew currentTime
@@ -467,24 +582,25 @@ class OMS:
         # Calculate priority
         priority = self.calculate_priority(order_creation_time, order_value)
 
-        # Insert new node with priority as key to order_tree
-        self.order_tree.insert(priority, order_id, order_creation_time, order_value, delivery_time, 0)
+        # Store the order's attributes and insert new node with priority as key to order_tree
+        slot = self.orders.add(order_id, order_creation_time, order_value, delivery_time, 0)
+        self.order_tree.insert(priority, slot)
 
         # Retrieve the node for the newly inserted order
         this_node = self.order_tree.search(order_id)
 
         # Change the order of node in order tree since the new order's successor has an ETA earlier than current time
-        while this_node and self.order_tree.find_successor(this_node.priority) and self.order_tree.find_predecessor(this_node.priority) and self.order_tree.find_successor(this_node.priority).eta < OMS.current_time:
+        while this_node and self.order_tree.find_successor(this_node.key) and self.order_tree.find_predecessor(this_node.key) and self.orders.eta[self.order_tree.find_successor(this_node.key).slot] < OMS.current_time:
             # If this order is in delivery tree then break loop
-            if self.delivery_tree.search(self.order_tree.find_successor(this_node.priority).order_id):
+            if self.delivery_tree.search(self.orders.order_id[self.order_tree.find_successor(this_node.key).slot]):
                 break
 
             # Find this node's predecessor and reduce a little of its priority to change the order in tree
-            delete_priority = self.order_tree.find_predecessor(this_node.priority).priority - 0.01
+            delete_priority = self.order_tree.find_predecessor(this_node.key).priority - PRIORITY_NUDGE
 
             # Re-insert the node with changed priority so it goes to correct position
             self.order_tree.delete(order_id)
-            self.order_tree.insert(delete_priority, order_id, order_creation_time, order_value, delivery_time, 0)
+            self.order_tree.insert(delete_priority, slot)
 
             # Loop to next node
             this_node = self.order_tree.search(order_id)
@@ -492,12 +608,12 @@ class OMS:
         # Calculate ETA for the order
         eta = self.calculate_eta(order_id)
 
-        # Write creation message to a text file
-        with open(output_file, "a") as file:
-            file.write(f"Order {order_id} has been created - ETA: {eta}\n")
+        # Write creation message to the output file
+        results.write(fmt.ORDER_CREATED, order_id, eta)
 
         # Insert new node with data (orderId, ETA) to delivery_tree
-        self.delivery_tree.insert(eta, order_id)
+        self.delivery_tree.insert(eta, slot)
+        self.scheduler.schedule(order_id)
 
         # Update ETA
         self.update_eta(order_id)
@@ -510,76 +626,90 @@ class OMS:
         order_node = self.order_tree.search(order_id)
         if order_node:
             # Extract order details
-            order_creation_time = order_node.order_creation_time
-            order_value = order_node.order_value
-            delivery_time = order_node.delivery_time
-            eta = order_node.eta
+            slot = order_node.slot
+            order_creation_time = self.orders.order_creation_time[slot]
+            order_value = self.orders.order_value[slot]
+            delivery_time = self.orders.delivery_time[slot]
+            eta = self.orders.eta[slot]
             
-            # Write order details to a text file
-            with open(output_file, "a") as file:
-                file.write(f"[{order_id}, {order_creation_time}, {order_value}, {delivery_time}, {eta}]\n")
+            # Write order details to the output file
+            results.write(fmt.ORDER_DETAILS, order_id, order_creation_time, order_value, delivery_time, eta)
             
         else:
-            with open(output_file, "a") as file:
-                file.write("There are no orders with that ID")
+            results.write(fmt.NO_ORDER_WITH_ID)
 
     def print(self, time1, time2):
         orders = []
         # Search for orders with ETA between time1 and time2 in the delivery_tree
         orders = self.delivery_tree.search_range(time1, time2)
 
-        # Write the result to a text file
-        with open(output_file, "a") as file:
-            if orders:
-                # Construct the formatted string
-                formatted_orders = '[' + ', '.join(str(order) for order in orders) + ']\n'
-                file.write(formatted_orders)  # Write the formatted string
-            else:
-                file.write("There are no orders in that time period\n")
+        # Write the result to the output file
+        if orders:
+            results.write_orders(orders)
+        else:
+            results.write(fmt.NO_ORDERS_IN_RANGE)
+
+    def count_orders(self, time1, time2):
+        # Count orders with ETA between time1 and time2 using the delivery_tree subtree aggregates
+        count, _, _ = self.delivery_tree.range_aggregate(time1, time2)
+
+        # Write the result to the output file
+        results.write(fmt.ORDER_COUNT, count)
+
+    def sum_order_value(self, time1, time2):
+        # Total order value of orders with ETA between time1 and time2
+        _, value_sum, _ = self.delivery_tree.range_aggregate(time1, time2)
+
+        # Write the result to the output file
+        results.write(fmt.ORDER_VALUE_SUM, value_sum)
+
+    def sum_delivery_time(self, time1, time2):
+        # Total delivery time of orders with ETA between time1 and time2
+        _, _, delivery_time_sum = self.delivery_tree.range_aggregate(time1, time2)
+
+        # Write the result to the output file
+        results.write(fmt.DELIVERY_TIME_SUM, delivery_time_sum)
 
     def calculate_priority(self, order_creation_time, order_value):
-        # Calculate order priority based on order creation time and value
-        value_weight = 0.3
-        time_weight = 0.7
-        normalized_order_value = order_value / 50
-        return value_weight * normalized_order_value - time_weight * order_creation_time
+        # Calculate order priority based on order creation time and value:
+        # 0.3 * (order_value / 50) - 0.7 * order_creation_time, scaled by 500 to stay an exact integer
+        value_weight = 3
+        time_weight = 350
+        return value_weight * order_value - time_weight * order_creation_time
     
     def calculate_eta(self, order_id):
         # Calculate ETA for a given order based on its attributes and successor's attributes
+        orders = self.orders
         node = self.order_tree.search(order_id)
-        eta = node.delivery_time # add node's delivery time first
-        successor = self.order_tree.find_successor(node.priority)
+        eta = orders.delivery_time[node.slot] # add node's delivery time first
+        successor = self.order_tree.find_successor(node.key)
 
         if successor is None: # no successor means first node
-            eta += node.order_creation_time
+            eta += orders.order_creation_time[node.slot]
         else: # add successor's delivery time and eta to this node's eta
-            eta += successor.delivery_time
-            eta += successor.eta
+            eta += orders.delivery_time[successor.slot]
+            eta += orders.eta[successor.slot]
         
-        # Assign added eta to node's attribute
-        node.eta = eta
+        # Assign added eta to the order's column
+        orders.eta[node.slot] = eta
 
         return eta
 
     def deliver_orders(self, current_time):
-        # Helper function for inorder traversal
-        def traverse(node):
-            if node is None:
-                return
-            traverse(node.left)
-            # Check if the order is ready for delivery
-            if node.eta <= current_time:
-                # If an order is delivered, add its orderId to the list
-                orderId, eta = node.order_id, node.eta
-                # Delete the delivered node from delivery_tree
-                self.delivery_tree.delete(orderId)
-                # Write delivery message to a text file
-                with open(output_file, "a") as file:
-                    file.write(f"Order {orderId} has been delivered at time {eta}\n")
-            traverse(node.right)
-
-        # Start traversal from the root of the delivery_tree
-        traverse(self.delivery_tree.root)
+        # Fire every scheduled delivery whose ETA has been reached, in ETA order
+        for order_id, eta in self.scheduler.pop_due(current_time):
+            # Delete the delivered node from delivery_tree
+            self.delivery_tree.delete(order_id)
+            # Write delivery message to the output file
+            results.write(fmt.ORDER_DELIVERED, order_id, eta)
+
+    def advance_time(self, current_system_time):
+        # Move the clock forward without any other command and deliver what has become due;
+        # a time earlier than current_time is ignored so the clock never runs backwards
+        if current_system_time < OMS.current_time:
+            return
+        OMS.current_time = current_system_time
+        self.deliver_orders(OMS.current_time)
 
     def cancel_order(self, order_id, current_system_time):
         # Renew current_time
@@ -595,21 +725,23 @@ class OMS:
 
             # Delete the order from order_tree
             order_node = self.order_tree.search(order_id)
-            successor = self.order_tree.find_successor(order_node.priority)
+            slot = order_node.slot
+            successor = self.order_tree.find_successor(order_node.key)
             self.order_tree.delete(order_id)
 
-            # Write cancellation message to a text file
-            with open(output_file, "a") as file:
-                file.write(f"Order {order_id} has been canceled\n")
+            # No tree refers to the order any more, so its slot can be reused
+            self.orders.remove(slot)
+
+            # Write cancellation message to the output file
+            results.write(fmt.ORDER_CANCELED, order_id)
 
-            # Update affected ETA since we delete node
-            self.update_eta(successor.order_id)
+            # Update affected ETA since we delete node; without a successor every remaining order is affected
+            self.update_eta(self.orders.order_id[successor.slot] if successor else None)
 
         # If order not found or already delivered
         else:
-            # Write error message to a text file
-            with open(output_file, "a") as file:
-                file.write(f"Cannot cancel. Order {order_id} has already been delivered\n")
+            # Write error message to the output file
+            results.write(fmt.CANNOT_CANCEL, order_id)
         
         # Check if any orders are delivered
         self.deliver_orders(OMS.current_time)
@@ -621,155 +753,154 @@ class OMS:
         order_node = self.order_tree.search(order_id)
         
         # Renew delivery_time
-        order_node.delivery_time = new_delivery_time
+        self.orders.delivery_time[order_node.slot] = new_delivery_time
 
         # Search orderId in delivery_tree
         delivery_node = self.delivery_tree.search(order_id)
 
+        # Keep the delivery_tree's delivery time totals in step with the store
+        if delivery_node:
+            self.delivery_tree.refresh(order_id)
+
         # Check if the order exists and its eta is bigger than current time
         if delivery_node and delivery_node.eta > OMS.current_time: 
             # Find successor of the order tree node
-            successor_node = self.order_tree.find_successor(order_node.priority)
+            successor_node = self.order_tree.find_successor(order_node.key)
             
-            # Renew all affected nodes etas 
-            self.update_eta(successor_node.order_id)
+            # Renew all affected nodes etas; without a successor the order itself is the highest one
+            self.update_eta(self.orders.order_id[successor_node.slot] if successor_node else None)
 
         else:
-            # Write error message to text file
-            with open(output_file, "a") as file:
-                file.write(f"Cannot update. Order {order_id} has already been delivered\n")
+            # Write error message to the output file
+            results.write(fmt.CANNOT_UPDATE, order_id)
         
         # Deliver orders
         self.deliver_orders(OMS.current_time)
 
     def update_eta(self, order_id):
+        # Recompute the ETAs of every order behind order_id, or of every order if order_id is None
         affected_order_id = []  # To store affected orderIds for writing to file
         affected_eta = []
-        node = self.order_tree.search(order_id)
+        if order_id is None:
+            # Start from the highest order itself
+            node = self.order_tree.find_max()
+        else:
+            # Start from the predecessor of the order
+            node = self.order_tree.find_predecessor(self.order_tree.search(order_id).key)
 
         while node:
-            # Find the predecessor of the current node
-            predecessor = self.order_tree.find_predecessor(node.priority)
-
-            if predecessor:
-                # Perform calculation on predecessor's eta
-                new_eta = self.calculate_eta(predecessor.order_id)
+            # Perform calculation on the node's eta
+            node_order_id = self.orders.order_id[node.slot]
+            new_eta = self.calculate_eta(node_order_id)
 
-                # Add to array
-                affected_order_id.append(predecessor.order_id)
-                affected_eta.append(new_eta)
+            # Add to array
+            affected_order_id.append(node_order_id)
+            affected_eta.append(new_eta)
 
-                # Move to the predecessor's predecessor for the next iteration
-                node = predecessor
-            else:
-                break  # No more predecessors, exit the loop
+            # Move to the predecessor for the next iteration
+            node = self.order_tree.find_predecessor(node.key)
 
         if len(affected_order_id) > 0:
-            # Construct the output string
-            output_string = "Updated ETAs: ["
-            for i in range(len(affected_order_id)):
-                output_string += f"{affected_order_id[i]}: {affected_eta[i]}, "
-            output_string = output_string.rstrip(", ") + "]\n"  # Remove the trailing comma and space
-
-            # Write the output string to a file
-            with open(output_file, "a") as file:
-                file.write(output_string)
+            # Write the affected orders and their new ETAs to the output file
+            results.write_updated_etas(affected_order_id, affected_eta)
         
         # Update ETA in delivery_tree
         for i in range(len(affected_order_id)):
-            # Search for the order_id in delivery_tree
+            # Search for the order_id in delivery_tree; delivered orders stay in order_tree but not here
             delivery_node = self.delivery_tree.search(affected_order_id[i])
 
             if delivery_node:
-                # Delete old node and update new node with new ETA
+                # Delete old node and update new node with new ETA (read the slot first, delete may reuse the node)
+                slot = delivery_node.slot
                 self.delivery_tree.delete(affected_order_id[i])
-                self.delivery_tree.insert(affected_eta[i], affected_order_id[i])
-            else:
-                # Handle the case where the order_id is not found in delivery_tree
-                print(f"Order ID {order_id} not found in delivery_tree.")
+                self.delivery_tree.insert(affected_eta[i], slot)
+                self.scheduler.schedule(affected_order_id[i])
 
     def get_rank_of_order(self, order_id):
-        # Perform inorder traversal to collect order IDs
-        _, order_id_array = self.delivery_tree.inorder_traversal()
-
-        # Write array contents to output file 
-        for i in range(len(order_id_array)):
-            if order_id == order_id_array[i]:
-                with open(output_file, "a") as file:
-                    file.write(f"Order {order_id} will be delivered after {i} orders.\n")
+        # Walk the delivery_tree in ETA order, stopping at the order
+        for i, (_, this_order_id) in enumerate(self.delivery_tree.inorder()):
+            if order_id == this_order_id:
+                # Write the number of orders ahead of it to output file
+                results.write(fmt.ORDER_RANK, order_id, i)
                 break
 
 
 def process_input(input_file):
-    # Read input from the specified file
-    with open(input_file, 'r') as file:
-        input_str = file.read()
+    # Read commands from the specified file as (opcode, p1, p2, p3, p4) tuples, text or binary
+    commands = fmt.read_commands(input_file)
 
     # Initialize an instance of the Order Management System
     oms = OMS()
 
-    # Split input string into lines and remove leading/trailing whitespace
-    input_lines = input_str.strip().split('\n')
-
-    # Iterate over each line in the input
-    for line in input_lines:
-        # Split the line into operation and parameters
-        tokens = line.strip().split('(')
-        operation = tokens[0]
-        params = tokens[1][:-1].split(',')
-        
+    # Iterate over each command in the input
+    for opcode, p1, p2, p3, p4 in commands:
         # Execute the corresponding operation based on the parsed command
-        if operation == 'createOrder':
-            # Extract parameters for creating a new order
-            order_id = int(params[0])
-            current_system_time = int(params[1])
-            order_value = int(params[2])
-            delivery_time = int(params[3])
-            oms.create_order(order_id, current_system_time, order_value, delivery_time)
-
-        elif operation == 'print':
-            # Determine whether to print order details or orders within a time range
-            if len(params) == 1:  # If only one parameter
-                order_id = int(params[0])
-                oms.prints(order_id)
-            elif len(params) == 2:  # If two parameters
-                time1 = int(params[0])
-                time2 = int(params[1])
-                oms.print(time1, time2)
-
-        elif operation == 'getRankOfOrder':
-            order_id = int(params[0])
-            oms.get_rank_of_order(order_id)
-
-        elif operation == 'cancelOrder':
-            order_id = int(params[0])
-            current_system_time = int(params[1])
-            oms.cancel_order(order_id, current_system_time)
-
-        elif operation == 'updateTime':
-            order_id = int(params[0])
-            current_system_time = int(params[1])
-            new_delivery_time = int(params[2])
-            oms.update_time(order_id, current_system_time, new_delivery_time)
-
-        elif operation == 'Quit':
-            # Perform inorder traversal to collect order IDs
-            eta_array, order_id_array = oms.delivery_tree.inorder_traversal()
-
-            for i in range(len(order_id_array)):
-                # Write delivery times to a text file
-                with open(output_file, "a") as delivery_file:
-                    delivery_file.write(f"Order {order_id_array[i]} will be delivered at time {eta_array[i]}\n")
+        if opcode == fmt.CREATE_ORDER:
+            # Parameters: order_id, current_system_time, order_value, delivery_time
+            oms.create_order(p1, p2, p3, p4)
+
+        elif opcode == fmt.PRINT_ORDER:
+            # Print order details of a single order_id
+            oms.prints(p1)
+
+        elif opcode == fmt.PRINT_RANGE:
+            # Print orders within the time range [p1, p2]
+            oms.print(p1, p2)
+
+        elif opcode == fmt.COUNT_ORDERS:
+            oms.count_orders(p1, p2)
+
+        elif opcode == fmt.SUM_ORDER_VALUE:
+            oms.sum_order_value(p1, p2)
+
+        elif opcode == fmt.SUM_DELIVERY_TIME:
+            oms.sum_delivery_time(p1, p2)
+
+        elif opcode == fmt.GET_RANK_OF_ORDER:
+            oms.get_rank_of_order(p1)
+
+        elif opcode == fmt.CANCEL_ORDER:
+            # Parameters: order_id, current_system_time
+            oms.cancel_order(p1, p2)
+
+        elif opcode == fmt.UPDATE_TIME:
+            # Parameters: order_id, current_system_time, new_delivery_time
+            oms.update_time(p1, p2, p3)
+
+        elif opcode == fmt.ADVANCE_TIME:
+            # Parameters: current_system_time
+            oms.advance_time(p1)
+
+        elif opcode == fmt.QUIT:
+            # Drain the remaining orders in ETA order straight into the buffered output file
+            for eta, order_id in oms.delivery_tree.inorder():
+                results.write(fmt.WILL_BE_DELIVERED, order_id, eta)
 
             return 
 
 
 def main():
+    global results
     if len(sys.argv) != 2:
         print("Usage: python gatorDelivery.py <filename>")
         sys.exit(1)
-    # Process input from the input file
-    process_input(input_file)
+
+    # Get the input file from makefile arguments
+    input_file = sys.argv[1]
+
+    # Extract the base name of the input file defined in the makefile
+    base_filename = os.path.splitext(input_file)[0]
+
+    # Binary command files (.bin) produce a binary result stream, text files produce text
+    output_extension = ".bin" if fmt.is_binary_file(input_file) else ".txt"
+    output_file = f"{base_filename}_output_file{output_extension}"
+    results = fmt.open_result_writer(output_file)  # This will clear the file
+
+    # Process input from the input file, closing the buffered writer even if processing fails
+    try:
+        process_input(input_file)
+    finally:
+        results.close()
     print("Output has been written to", output_file)
 
 if __name__ == "__main__":